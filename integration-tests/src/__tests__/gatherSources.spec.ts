@@ -151,6 +151,34 @@ describe("gatherSources function", function() {
     await expect(gatherSources(["main.sol"], __dirname, resolver)).rejects.toThrowError();
   });
 
+  it("returns files in breadth-first order", async function() {
+    const testFs: Dictionary = {
+      "main.sol": 'import "./first.sol";\nimport "./second.sol";\nimport "./third.sol";\nmain',
+      "first.sol": 'import "./deep/first.sol";\nfirst',
+      "second.sol": 'import "./deep/second.sol";\nsecond',
+      "third.sol": "third",
+      "deep/first.sol": "deep first",
+      "deep/second.sol": "deep second",
+    };
+
+    const EXPECTED_ORDER = ["main.sol", "first.sol", "second.sol", "third.sol", "deep/first.sol", "deep/second.sol"];
+
+    vol.fromJSON(testFs);
+    const fileList = await gatherSources(["main.sol"], __dirname, resolver);
+    expect(fileList.map(file => file.url)).toEqual(EXPECTED_ORDER.map(file => `${__dirname}/${file}`));
+  });
+
+  it("throws when a file in the middle of a level doesn't exist", async function() {
+    const testFs: Dictionary = {
+      "main.sol": 'import "./first.sol";\nimport "./missing.sol";\nimport "./third.sol";\nmain',
+      "first.sol": "first",
+      "third.sol": "third",
+    };
+
+    vol.fromJSON(testFs);
+    await expect(gatherSources(["main.sol"], __dirname, resolver)).rejects.toThrowError(/missing\.sol/);
+  });
+
   describe("URLs", function() {
     const FILE_GITHUB_NO_IMPORTS = "github something";
     const FILE_GITHUB_IMPORT_URL = 'a\nimport "http://somepage.tv/some/path/file.sol";\nrestoffile';
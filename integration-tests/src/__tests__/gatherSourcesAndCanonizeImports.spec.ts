@@ -0,0 +1,88 @@
+jest.mock("fs");
+import { gatherSourcesAndCanonizeImports } from "@resolver-engine/imports";
+import { ImportsFsEngine } from "@resolver-engine/imports-fs";
+import { vol } from "memfs";
+import path from "path";
+
+describe("gatherSourcesAndCanonizeImports function", function() {
+  const resolver = ImportsFsEngine();
+
+  beforeAll(function() {
+    // when using mock fs, we are being thrown into the root of the filesystem
+    // we need to call it so __dirname makes sense
+    process.chdir(__dirname);
+  });
+
+  afterEach(function() {
+    vol.reset();
+    jest.restoreAllMocks();
+  });
+
+  it("rewrites imports into resolved paths", async function() {
+    vol.fromJSON({
+      "main.sol": "import \"./folder/other.sol\";\nimport Lib from './lib.sol';\ncontract Main {}",
+      "folder/other.sol": "contract Other {}",
+      "lib.sol": "library Lib {}",
+    });
+
+    const fileList = await gatherSourcesAndCanonizeImports(["main.sol"], __dirname, resolver);
+    const main = fileList.find(file => file.url === path.join(__dirname, "main.sol"));
+
+    expect(fileList).toHaveLength(3);
+    expect(main!.source).toEqual(
+      `import "${path.join(__dirname, "folder/other.sol")}";\n` +
+        `import Lib from '${path.join(__dirname, "lib.sol")}';\n` +
+        "contract Main {}",
+    );
+  });
+
+  it("only rewrites paths inside import statements", async function() {
+    vol.fromJSON({
+      "main.sol": '// see "./other.sol" for details\nimport "./other.sol";\ncontract Main {}',
+      "other.sol": "contract Other {}",
+    });
+
+    const fileList = await gatherSourcesAndCanonizeImports(["main.sol"], __dirname, resolver);
+    const main = fileList.find(file => file.url === path.join(__dirname, "main.sol"));
+
+    expect(main!.source).toEqual(
+      `// see "./other.sol" for details\nimport "${path.join(__dirname, "other.sol")}";\ncontract Main {}`,
+    );
+  });
+
+  it("resolves a uri imported by several files from the same directory once", async function() {
+    vol.fromJSON({
+      "main.sol": 'import "./first.sol";\nimport "./second.sol";\ncontract Main {}',
+      "first.sol": 'import "./lib.sol";\ncontract First {}',
+      "second.sol": 'import "./lib.sol";\ncontract Second {}',
+      "lib.sol": "library Lib {}",
+    });
+    const resolveSpy = jest.spyOn(resolver, "resolve");
+
+    const fileList = await gatherSourcesAndCanonizeImports(["main.sol"], __dirname, resolver);
+    const libResolutions = resolveSpy.mock.calls.filter(([uri, cwd]) => uri === "./lib.sol" && cwd === __dirname);
+    const first = fileList.find(file => file.url === path.join(__dirname, "first.sol"));
+    const second = fileList.find(file => file.url === path.join(__dirname, "second.sol"));
+
+    expect(libResolutions).toHaveLength(1);
+    expect(first!.source).toEqual(`import "${path.join(__dirname, "lib.sol")}";\ncontract First {}`);
+    expect(second!.source).toEqual(`import "${path.join(__dirname, "lib.sol")}";\ncontract Second {}`);
+  });
+
+  it("leaves imports given by absolute path untouched", async function() {
+    const libPath = path.join(__dirname, "lib.sol");
+    const mainSource = `import "${path.join(__dirname, "other.sol")}";\ncontract Main {}`;
+    vol.fromJSON({
+      "main.sol": mainSource,
+      "other.sol": `import "${libPath}";\nimport "./lib.sol" as Lib;\ncontract Other {}`,
+      "lib.sol": "library Lib {}",
+    });
+
+    const fileList = await gatherSourcesAndCanonizeImports(["main.sol"], __dirname, resolver);
+    const main = fileList.find(file => file.url === path.join(__dirname, "main.sol"));
+    const other = fileList.find(file => file.url === path.join(__dirname, "other.sol"));
+
+    expect(main!.source).toBe(mainSource);
+    expect(other!.source).toBe(`import "${libPath}";\nimport "${libPath}" as Lib;\ncontract Other {}`);
+  });
+});
@@ -1,17 +1,9 @@
 import { Context, SubResolver } from "@resolver-engine/core";
 import * as fsSys from "fs";
 import * as pathSys from "path";
+import { promisify } from "util";
 
-const statAsync = (path: string): Promise<fsSys.Stats> =>
-  new Promise<fsSys.Stats>((resolve, reject) => {
-    fsSys.stat(path, (err, stats) => {
-      if (err) {
-        reject(err);
-      }
-
-      resolve(stats);
-    });
-  });
+const statAsync = promisify(fsSys.stat);
 const NO_FILE = "ENOENT";
 
 export function FsResolver(): SubResolver {
@@ -3,18 +3,24 @@ import pathSys from "path";
 import urlSys from "url";
 import { ImportFile } from "./parsers/importparser";
 
+// regex below matches all possible import statements, namely:
+// - import "somefile";
+// - import "somefile" as something;
+// - import something from "somefile"
+// (double that for single quotes)
+// and captures file names
+const IMPORT_STATEMENT = /import\s+(?:(?:"([^;]*)"|'([^;]*)')(?:;|\s+as\s+[^;]*;)|.+from\s+(?:"(.*)"|'(.*)');)/g;
+
+// upper bound on files fetched at once by gatherSources, fetches may hit the disk or remote hosts like GitHub
+const MAX_CONCURRENT_REQUIRES = 16;
+
 export function findImports(data: ImportFile): string[] {
   const result: string[] = [];
-  // regex below matches all possible import statements, namely:
-  // - import "somefile";
-  // - import "somefile" as something;
-  // - import something from "somefile"
-  // (double that for single quotes)
-  // and captures file names
-  const regex: RegExp = /import\s+(?:(?:"([^;]*)"|'([^;]*)')(?:;|\s+as\s+[^;]*;)|.+from\s+(?:"(.*)"|'(.*)');)/g;
+  // the regex is global and shared, so its lastIndex has to start from the beginning on each call
+  IMPORT_STATEMENT.lastIndex = 0;
   let match: RegExpExecArray | null;
   // tslint:disable-next-line:no-conditional-assignment
-  while ((match = regex.exec(data.source))) {
+  while ((match = IMPORT_STATEMENT.exec(data.source))) {
     for (let i = 1; i < match.length; i++) {
       if (match[i] !== undefined) {
         result.push(match[i]);
@@ -46,6 +52,18 @@ async function gatherDepenencyTree(
 ): Promise<ImportTreeNode[]> {
   const result: ImportTreeNode[] = [];
   const alreadyImported = new Set();
+  // the same uri is often imported by many files from the same directory, resolving it once is enough
+  const resolvedUrls = new Map<string, Promise<string>>();
+
+  function resolveCached(uri: string, searchCwd: string): Promise<string> {
+    const key = `${searchCwd}\0${uri}`;
+    let url = resolvedUrls.get(key);
+    if (url === undefined) {
+      url = resolver.resolve(uri, searchCwd);
+      resolvedUrls.set(key, url);
+    }
+    return url;
+  }
 
   /**
    * This function traverses the depedency tree and calculates absolute paths for each import on the way storing each file in in a global array
@@ -53,7 +71,7 @@ async function gatherDepenencyTree(
    * @returns An absolute path for the requested file
    */
   async function dfs(file: { searchCwd: string; uri: string }): Promise<string> {
-    const url = await resolver.resolve(file.uri, file.searchCwd);
+    const url = await resolveCached(file.uri, file.searchCwd);
     if (alreadyImported.has(url)) {
       return url;
     }
@@ -110,9 +128,25 @@ export async function gatherSources(
     queue.push({ cwd: workingDir, file: absWhat, relativeTo: workingDir });
     alreadyImported.add(absWhat);
   }
-  while (queue.length > 0) {
-    const fileData = queue.shift()!;
-    const resolvedFile: ImportFile = await resolver.require(fileData.file, fileData.cwd);
+  // files are fetched ahead of the walk, at most MAX_CONCURRENT_REQUIRES at a time,
+  // but processed in queue order, which keeps the result the same as a sequential walk
+  const fetched: Array<Promise<ImportFile>> = [];
+  function fetchAhead(from: number) {
+    while (fetched.length < queue.length && fetched.length < from + MAX_CONCURRENT_REQUIRES) {
+      const { file, cwd } = queue[fetched.length];
+      const pending = resolver.require(file, cwd);
+      // a failure is reported when the walk reaches this file, don't let it go unhandled before that
+      pending.catch(() => undefined);
+      fetched.push(pending);
+    }
+  }
+
+  // iterating instead of shift()-ing keeps dequeuing O(1) for large dependency trees,
+  // the iterator also visits files pushed onto the queue during the loop
+  let index = 0;
+  for (const fileData of queue) {
+    fetchAhead(index);
+    const resolvedFile: ImportFile = await fetched[index++];
     const foundImports = findImports(resolvedFile);
 
     // if imported path starts with '.' we assume it's relative and return it's
@@ -158,8 +192,30 @@ export async function gatherSourcesAndCanonizeImports(
   workingDir: string,
   resolver: ResolverEngine<ImportFile>,
 ): Promise<ImportFile[]> {
+  // rewrites imports in a single pass over the import statements only,
+  // so that a path mentioned elsewhere in the file (e.g. in a comment) is left untouched
   function canonizeFile(file: ImportTreeNode) {
-    file.imports.forEach(i => (file.source = file.source.replace(i.uri, i.url)));
+    // nothing to rewrite, e.g. every import was already given as an absolute path
+    if (file.imports.every(i => i.uri === i.url)) {
+      return;
+    }
+    const canonical = new Map<string, string>(file.imports.map(i => [i.uri, i.url] as [string, string]));
+    file.source = file.source.replace(IMPORT_STATEMENT, (statement: string, ...groups: Array<string | undefined>) => {
+      // groups 1 and 3 are double quoted, 2 and 4 single quoted
+      for (let i = 0; i < 4; i++) {
+        const uri = groups[i];
+        if (uri === undefined) {
+          continue;
+        }
+        const url = canonical.get(uri);
+        if (url === undefined || url === uri) {
+          return statement;
+        }
+        const quote = i % 2 === 0 ? '"' : "'";
+        return statement.replace(quote + uri + quote, () => quote + url + quote);
+      }
+      return statement;
+    });
   }
 
   const sources = await gatherDepenencyTree(roots, workingDir, resolver);